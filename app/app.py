@@ -1,19 +1,81 @@
+import bisect
+import functools
+import math
 import re
+from decimal import Decimal
 from io import BytesIO
-from reportlab.platypus import Image
-from reportlab.lib.styles import ParagraphStyle
-import matplotlib.pyplot as plt
-import tempfile
+import textwrap
 import numpy as np
 import pandas as pd
 import plotly.express as px
 import plotly.graph_objects as go
 import streamlit as st
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from scipy.stats import chisquare
+# reportlab, matplotlib e scipy são importados apenas onde usados (create_pdf e benford_chi2),
+# reduzindo o tempo de inicialização do app para quem só carrega e inspeciona dados
+
+# Numba é opcional: acelera a contagem de dígitos em colunas muito grandes
+try:
+    from numba import get_num_threads, njit, prange
+    _HAS_NUMBA = True
+except ImportError:
+    _HAS_NUMBA = False
+
+# Polars é opcional: extração de dígitos pela representação textual, sem log10/floor por elemento
+# (desativado por padrão, ver POLARS_MIN_SIZE)
+try:
+    import polars as pl
+    _HAS_POLARS = True
+except ImportError:
+    _HAS_POLARS = False
+
+# Expressões regulares pré-compiladas para limpeza de valores formatados
+_NON_NUMERIC_RE = re.compile(r'[^\d.,\-]')  # Mantém dígitos, separadores e sinal negativo
+_NON_NUMERIC_PLUS_RE = re.compile(r'[^\d.,\-+]')  # Idem, mantendo também o sinal positivo
+
+# Distribuição esperada de Benford para os primeiros dígitos 1-9 (em proporções): P(d) = log10(1 + 1/d)
+BENFORD_PROPORTIONS = np.log10(1.0 + 1.0 / np.arange(1, 10))
+BENFORD_PCT = BENFORD_PROPORTIONS * 100  # Mesma distribuição em porcentagem
+
+# Menor expoente decimal de um float (5e-324): primeira linha da tabela de limites de dígito
+FIRST_DIGIT_MIN_EXPONENT = -324
+
+
+def _first_digit_bounds():
+    """
+    Limites de dígito em ordem crescente: o elemento (e - FIRST_DIGIT_MIN_EXPONENT) * 9 + (k - 1) é o
+    menor float cuja representação decimal (repr) começa pelo dígito k com expoente e; termina com +inf
+    como sentinela.
+    O primeiro dígito de x é então (posição do maior limite <= x) % 9 + 1, sem divisões por
+    potências de 10 inexatas (ex.: 0.3 / 0.1 == 2.9999999999999996).
+    """
+    bounds = []
+    for e in range(FIRST_DIGIT_MIN_EXPONENT, 309):
+        for k in range(1, 10):
+            bound = float(f"{k}e{e}")
+            # Subnormais: k·10^e pode arredondar para baixo, para um float exibido com dígito menor
+            if Decimal(repr(bound)) < Decimal(f"{k}e{e}"):
+                bound = math.nextafter(bound, math.inf)
+            bounds.append(bound)
+    bounds.append(math.inf)
+    return bounds
+
+
+FIRST_DIGIT_BOUNDS = _first_digit_bounds()
+FIRST_DIGIT_BOUNDS_ARRAY = np.array(FIRST_DIGIT_BOUNDS)  # Mesma tabela para os caminhos vetorizados
+
+# CSVs acima deste tamanho são analisados lendo o arquivo em blocos (memória proporcional ao bloco,
+# não ao arquivo). A visualização e a detecção de colunas usam apenas as primeiras linhas.
+LARGE_CSV_BYTES = 100 * 1024 * 1024
+CSV_CHUNK_ROWS = 200_000
+CSV_PREVIEW_ROWS = 100_000
+
+# Arrays acima deste tamanho usam o kernel Numba paralelo (quando instalado) na contagem de dígitos
+NUMBA_MIN_SIZE = 500_000
+
+# Arrays acima deste tamanho usam o Polars (quando instalado) na contagem e na filtragem dos valores.
+# None desativa: medido contra o caminho NumPy (10 mil a 5 milhões de valores), o Polars foi cerca de
+# 2x mais lento tanto na contagem quanto na filtragem.
+POLARS_MIN_SIZE = None
 
 # Configuração da página
 st.set_page_config(page_title="Benford Analytics", layout="wide",
@@ -30,6 +92,11 @@ def extract_first_digit(x):
         return None
 
     try:
+        # Caminho rápido: valores já numéricos dispensam a conversão para string e a regex
+        # (bool é subclasse de int, mas não é um valor numérico para a análise)
+        if isinstance(x, (int, float, np.integer, np.floating)) and not isinstance(x, bool):
+            return _first_digit_of_float(float(x))
+
         # Converter para string primeiro para tratar formatos especiais
         # Usar str(x) para garantir que funciona com qualquer tipo (número, string, etc.)
         x_str = str(x)
@@ -37,7 +104,7 @@ def extract_first_digit(x):
         # Remover caracteres não numéricos (exceto ponto e vírgula e sinal negativo)
         # Funciona para formatos como "R$ 1.234,56" ou "$1,234.56"
         # Adicionado tratamento para sinal negativo
-        x_clean = re.sub(r'[^\d.,\-]', '', x_str)
+        x_clean = _NON_NUMERIC_RE.sub('', x_str)
 
         # Normalizar separadores (considerando formatos internacionais)
         if ',' in x_clean and '.' in x_clean:
@@ -52,41 +119,198 @@ def extract_first_digit(x):
             x_clean = x_clean.replace(',', '.')
 
         # Tentar converter para float
-        x_float = float(x_clean)
+        return _first_digit_of_float(float(x_clean))
+
+    except (ValueError, TypeError, AttributeError, OverflowError):
+        # Captura erros de conversão ou atributos inesperados (OverflowError: inteiros grandes demais para float)
+        return None
+
+
+def _first_digit_of_float(x_float):
+    """
+    Primeiro dígito significativo de um float (None para zero, NaN e infinito).
+    """
+    # Lidar com zeros e valores não finitos após a conversão para float
+    if x_float == 0 or not math.isfinite(x_float):
+        return None
+
+    # Busca binária nos limites de dígito: exata para qualquer magnitude, inclusive subnormais
+    # (trata casos como 0.00123 -> 1 ou 123.45 -> 1; negativos usam o valor absoluto)
+    position = bisect.bisect_right(FIRST_DIGIT_BOUNDS, abs(x_float)) - 1
+    return position % 9 + 1
 
-        # Lidar com zeros e negativos após a conversão para float
-        if x_float == 0:
-            return None
 
-        # Garantir que trabalhamos com o valor absoluto para o primeiro dígito
-        x_abs = abs(x_float)
+# Função vetorizada para extrair os primeiros dígitos de um array numérico
+def extract_first_digits_vectorized(values):
+    """
+    Extrai o primeiro dígito significativo de cada valor de um array numérico usando NumPy.
+    Zeros, NaN e infinitos são descartados. Equivalente a aplicar extract_first_digit
+    elemento a elemento, porém sem chamadas Python por linha.
+    """
+    arr = np.asarray(values, dtype=np.float64)
+    mask = np.isfinite(arr) & (arr != 0)
+    a = np.abs(arr[mask])
+
+    # Busca nos limites de dígito (mesma regra de _first_digit_of_float): a divisão pela potência de 10
+    # do expoente erra perto dos limites (7e25 -> 6) e não existe para subnormais (10.0 ** -324 == 0)
+    positions = np.searchsorted(FIRST_DIGIT_BOUNDS_ARRAY, a, side='right') - 1
+
+    return (positions % 9 + 1).astype(np.int8)
+
+
+if _HAS_NUMBA:
+    # Compilação sob demanda (sem assinatura explícita): aceita também arrays somente leitura.
+    # fastmath não é usado: ele permite ao LLVM assumir que não há NaN/inf e eliminar o teste isfinite.
+    @njit(parallel=True, cache=True)
+    def _first_digit_counts_numba(arr, bounds, n_chunks):
+        """
+        Kernel Numba: abs -> log10 -> busca nos limites de dígito -> contagem em uma única passada, sem
+        arrays temporários. Cada um dos n_chunks blocos acumula um histograma local, somados no final.
+        bounds é FIRST_DIGIT_BOUNDS_ARRAY: mesma regra de extract_first_digits_vectorized.
+        n_chunks vem de fora (get_num_threads()): chamado dentro do kernel, impediria o cache em disco.
+        """
+        n = arr.shape[0]
+        last = bounds.shape[0] - 2  # bounds[-1] é +inf: sentinela para bounds[p + 1]
+        step = (n + n_chunks - 1) // n_chunks
+        local_counts = np.zeros((n_chunks, 10), dtype=np.int64)
+        for c in prange(n_chunks):
+            for i in range(c * step, min((c + 1) * step, n)):
+                x = abs(arr[i])
+                if x == 0.0 or not np.isfinite(x):
+                    continue
+                # O log10 só estima a linha do expoente na tabela; a posição exata é ajustada por
+                # comparação com os limites (sem divisão por 10.0 ** e, inexata no Numba)
+                p = (math.floor(math.log10(x)) - FIRST_DIGIT_MIN_EXPONENT) * 9
+                if p < 0:
+                    p = 0
+                elif p > last:
+                    p = last
+                while x < bounds[p]:
+                    p -= 1
+                while x >= bounds[p + 1]:
+                    p += 1
+                local_counts[c, p % 9 + 1] += 1
+        return local_counts.sum(axis=0)
+
+
+def _use_polars(n):
+    """
+    Indica se um array de n valores deve usar o caminho Polars (ver POLARS_MIN_SIZE).
+    """
+    return _HAS_POLARS and POLARS_MIN_SIZE is not None and n > POLARS_MIN_SIZE
 
-        # Normalizar para obter o primeiro dígito significativo
-        # Trata casos como 0.00123 -> 1.23 ou 123.45 -> 1.23
-        if x_abs < 1:
-            while x_abs < 1:
-                x_abs *= 10
-        elif x_abs >= 10:
-            while x_abs >= 10:
-                x_abs /= 10
 
-        # O primeiro dígito é a parte inteira
-        first_digit = int(x_abs)
+if _HAS_POLARS:
+    def _first_digit_counts_polars(arr):
+        """
+        Contagem via Polars: o primeiro dígito é o primeiro caractere significativo do texto do valor
+        absoluto (zeros à esquerda e o ponto removidos), evitando duas operações transcendentais por valor.
+        """
+        s = pl.Series(arr)
+        s = s.filter(s.is_finite() & (s != 0))
+        digits = s.abs().cast(pl.Utf8).str.strip_chars_start("-0.").str.slice(0, 1).cast(pl.UInt8)
+        return np.bincount(digits.to_numpy(), minlength=10)
 
-        # Deve estar entre 1 e 9. Se for 0 (acontece com números muito pequenos tipo 0.000...)
-        # a normalização já deveria ter tratado, mas como segurança...
-        if first_digit == 0:
-            # Isso não deve acontecer com a normalização acima, mas é um fallback
-            return None  # Ou retornar 1 se assumirmos que 0.0...1 deve começar com 1?
 
-        return first_digit
+# Função para extrair os valores válidos (finitos e filtrados) de uma coluna numérica
+def filtered_column_values(series, remove_zeros, remove_negatives):
+    """
+    Retorna um array float64 contíguo com os valores finitos da coluna, aplicando os filtros de zeros e
+    negativos com uma única máscara booleana NumPy. Acima de POLARS_MIN_SIZE, conversão, remoção de nulos
+    e filtros rodam nos kernels do Polars.
+    """
+    if _use_polars(len(series)):
+        # from_pandas converte NaN em null: drop_nulls remove ambos de uma vez
+        s = pl.from_pandas(series).cast(pl.Float64, strict=False).drop_nulls()
+        predicate = s.is_finite()
+        if remove_zeros:
+            predicate = predicate & (s != 0)
+        if remove_negatives:
+            predicate = predicate & (s > 0)
+        # writable=True: mesmo contrato do caminho NumPy (o array do Polars é somente leitura)
+        return s.filter(predicate).to_numpy(writable=True)
+
+    values = np.ascontiguousarray(series.to_numpy(dtype=np.float64, na_value=np.nan))
+    mask = np.isfinite(values)
+    if remove_zeros:
+        mask &= values != 0
+    if remove_negatives:
+        mask &= values > 0
+    return values[mask]
+
+
+# Função para contar os primeiros dígitos de um array numérico
+def count_first_digits(values):
+    """
+    Retorna as contagens dos primeiros dígitos 1-9 (array de 9 posições) de um array numérico.
+    Zeros, NaN e infinitos são ignorados. Arrays grandes usam o kernel Numba paralelo, quando disponível;
+    os demais, o caminho NumPy (ou o Polars, acima de POLARS_MIN_SIZE).
+    """
+    arr = np.ascontiguousarray(values, dtype=np.float64)
+    if _HAS_NUMBA and len(arr) > NUMBA_MIN_SIZE:
+        return _first_digit_counts_numba(arr, FIRST_DIGIT_BOUNDS_ARRAY, get_num_threads())[1:10]
+    if _use_polars(len(arr)):
+        return _first_digit_counts_polars(arr)[1:10]
+    return np.bincount(extract_first_digits_vectorized(arr), minlength=10)[1:10]
 
-    except (ValueError, TypeError, AttributeError):
-        # Captura erros de conversão ou atributos inesperados
-        return None
+
+# Função para o teste chi-quadrado de aderência à Lei de Benford
+def benford_chi2(observed_counts, expected_counts):
+    """
+    Retorna (estatística Chi², valor-p) para as contagens observadas e esperadas (arrays do mesmo tamanho).
+    """
+    from scipy.special import gammaincc
+
+    # Estatística calculada diretamente com NumPy (9 elementos: evita o overhead de validação do
+    # scipy.stats.chisquare, que chega ao mesmo resultado)
+    observed_counts = np.asarray(observed_counts, dtype=np.float64)
+    diff = observed_counts - expected_counts
+    chi2 = float(np.sum(diff * diff / expected_counts))
+    # p-valor: cauda superior da chi² com k-1 graus de liberdade, Q((k-1)/2, chi2/2)
+    p = float(gammaincc((len(observed_counts) - 1) / 2.0, chi2 / 2.0))
+    return chi2, p
+
+
+# Função para converter uma coluna de texto com números formatados em float
+def coerce_numeric_text(series):
+    """
+    Converte uma Series de texto (ex.: "R$ 1.234", " 12,5 ") em float64, com NaN para valores inválidos.
+    """
+    # Caminho rápido: to_numeric direto (sem regex) resolve números armazenados como texto
+    numeric_values = pd.to_numeric(series, errors='coerce').astype('float64')
+    failed = numeric_values.isna() & series.notna()
+    if not failed.any():
+        return numeric_values
+
+    # Limpeza básica vetorizada (métodos .str do pandas) apenas para os valores que falharam
+    cleaned = series[failed].astype('string').str.strip()
+    cleaned = cleaned.mask(cleaned == '')
+    cleaned = cleaned.str.replace(',', '.', regex=False).str.replace(_NON_NUMERIC_PLUS_RE, '', regex=True)
+
+    # Tentativa final de converter para float, com errors='coerce' para transformar falhas em NaN
+    # (astype garante float64 em vez do dtype anulável retornado para colunas 'string')
+    numeric_values[failed] = pd.to_numeric(cleaned, errors='coerce').astype('float64')
+    return numeric_values
+
+
+# Função para gerar a chave de cache exata de Series/DataFrames
+# O hash padrão do st.cache_data usa só uma amostra de 10 mil linhas para objetos com 100 mil
+# linhas ou mais; um arquivo corrigido fora da amostra reaproveitaria o resultado antigo.
+def _exact_pandas_hash(obj):
+    """
+    Retorna uma chave que cobre todas as linhas do objeto (valores e índice), além dos nomes e dtypes.
+    """
+    if isinstance(obj, pd.DataFrame):
+        schema = (tuple(map(str, obj.columns)), tuple(map(str, obj.dtypes)))
+    else:
+        schema = (str(obj.name), str(obj.dtype))
+    return schema, pd.util.hash_pandas_object(obj).values.tobytes()
 
 
 # Função para normalizar os dados
+# Em cache: as mensagens st.info/st.warning emitidas aqui são reproduzidas pelo Streamlit ao reutilizar o resultado.
+# Poucas entradas: cada uma guarda uma cópia inteira do DataFrame.
+@st.cache_data(show_spinner=False, max_entries=4, hash_funcs={pd.DataFrame: _exact_pandas_hash})
 def normalize_dataframe(df):
     """
     Prepara o DataFrame para análise, normalizando valores e detectando colunas numéricas.
@@ -99,6 +323,10 @@ def normalize_dataframe(df):
 
     # Verificar cada coluna
     for col in df_clean.columns:
+        # Colunas booleanas (True/False) não têm primeiro dígito: não entram na análise
+        if pd.api.types.is_bool_dtype(df_clean[col]):
+            continue
+
         # Se já é numérica, adicionar à lista e continuar
         if pd.api.types.is_numeric_dtype(df_clean[col]):
             potential_numeric_cols.append(col)
@@ -109,16 +337,7 @@ def normalize_dataframe(df):
             # Tentar converter valores formatados em números usando a lógica do extract_first_digit
             try:
                 # Criar uma nova coluna com a tentativa de conversão para float
-                # Reutilizamos a lógica de limpeza do extract_first_digit para a conversão
-                df_clean[f"{col}_numeric"] = df_clean[col].apply(
-                    lambda x: None if pd.isna(x) or str(x).strip() == ''
-                    else re.sub(r'[^\d.,\-+]', '', str(x).replace(',', '.'))  # Apply basic cleaning
-                )
-
-                # Tentativa final de converter para float, com errors='coerce' para transformar falhas em NaN
-                df_clean[f"{col}_numeric"] = pd.to_numeric(
-                    df_clean[f"{col}_numeric"], errors='coerce'
-                )
+                df_clean[f"{col}_numeric"] = coerce_numeric_text(df_clean[col])
 
                 # Verificar se a nova coluna numérica tem valores válidos (não todos NaN)
                 if not df_clean[f"{col}_numeric"].isna().all():
@@ -148,29 +367,41 @@ def normalize_dataframe(df):
                 if f"{col}_numeric" in df_clean.columns:
                     df_clean = df_clean.drop(columns=[f"{col}_numeric"])
 
-    # Remover colunas temporárias que foram criadas mas não identificadas como numéricas (segurança)
-    cols_to_drop_temp = [c for c in df_clean.columns if c.endswith('_numeric') and c not in potential_numeric_cols]
-    df_clean = df_clean.drop(columns=cols_to_drop_temp)
+    # Reduzir o uso de memória (menos bytes a percorrer na extração de dígitos)
+    memory_before = df_clean.memory_usage(deep=True).sum()
+    for c in potential_numeric_cols:
+        # Downcast apenas para inteiros: sem perda de informação. Floats permanecem float64,
+        # pois float32 poderia alterar o primeiro dígito de valores próximos a potências de 10.
+        df_clean[c] = pd.to_numeric(df_clean[c], downcast='integer')
+    for c in df_clean.columns:
+        # Colunas de texto com baixa cardinalidade viram 'category'
+        if pd.api.types.is_object_dtype(df_clean[c]) and len(df_clean) > 0 \
+                and df_clean[c].nunique() / len(df_clean) < 0.5:
+            df_clean[c] = df_clean[c].astype('category')
+    memory_after = df_clean.memory_usage(deep=True).sum()
+    if memory_after < memory_before:
+        st.info(f"Uso de memória dos dados reduzido de {memory_before / 1024 ** 2:.1f} MB "
+                f"para {memory_after / 1024 ** 2:.1f} MB.")
 
     return df_clean, potential_numeric_cols
 
 
-# Função para criar o PDF
-def create_pdf(observed_counts, benford_dist, chi2, p_value, total_count, column_name, mad, sad):
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter)
-    elements = []
+# Estilos do relatório PDF
+# getSampleStyleSheet() e o TableStyle são construídos uma única vez por processo; os estilos do
+# reportlab não são alterados durante o build e podem ser compartilhados entre documentos.
+# O reportlab continua sendo importado apenas quando o primeiro relatório é gerado.
+@functools.lru_cache(maxsize=None)
+def pdf_styles():
+    """
+    Retorna a folha de estilos do relatório (incluindo os estilos personalizados) e o TableStyle da tabela detalhada.
+    """
+    from reportlab.lib import colors
+    from reportlab.lib.styles import ParagraphStyle, getSampleStyleSheet
+    from reportlab.platypus import TableStyle
 
     styles = getSampleStyleSheet()
-    # Estilos básicos
-    title_style = styles['Heading1']
-    subtitle_style = styles['Heading2']
-    normal_style = styles['Normal']
-    # Adicionar ou modificar estilos para a conclusão, se desejar cores/ênfase
-    h3_style = styles['Heading3']  # Estilo para subtítulos menores
 
     # Estilos personalizados
-    styles = getSampleStyleSheet()
     styles.add(ParagraphStyle(
         name='Titulo',
         fontSize=18,
@@ -187,6 +418,38 @@ def create_pdf(observed_counts, benford_dist, chi2, p_value, total_count, column
         leading=14
     ))
 
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),  # Cor para as linhas de dados
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+    return styles, table_style
+
+
+# Função para criar o PDF
+def create_pdf(observed_counts, chi2, p_value, total_count, column_name, mad, sad, benford_dist=BENFORD_PROPORTIONS):
+    import matplotlib.pyplot as plt
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import Image, SimpleDocTemplate, Paragraph, Preformatted, Spacer, Table
+
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=letter)
+    elements = []
+
+    # Folha de estilos (com os estilos personalizados) e estilo da tabela, construídos uma única vez
+    styles, table_style = pdf_styles()
+    # Estilos básicos
+    title_style = styles['Heading1']
+    subtitle_style = styles['Heading2']
+    normal_style = styles['Normal']
+    # Adicionar ou modificar estilos para a conclusão, se desejar cores/ênfase
+    h3_style = styles['Heading3']  # Estilo para subtítulos menores
+
     def add_header(canvas, doc):
         canvas.saveState()
         canvas.setFont('Helvetica-Bold', 10)
@@ -246,61 +509,58 @@ def create_pdf(observed_counts, benford_dist, chi2, p_value, total_count, column
     # Tabela detalhada
     data = [["Dígito", "Contagem", "Observado (%)", "Esperado (%)", "Diferença (%)"]]
 
-    # Garantir que os dados da tabela estejam na ordem correta e completos (dígitos 1-9)
-    for d in range(1, 10):
-        obs_count = observed_counts.get(d, 0)
-        # Calcular porcentagens e diferenças com base no total_count passado (registros válidos)
-        obs_pct = (obs_count / total_count) * 100 if total_count > 0 else 0
-        # A distribuição de Benford (benford_dist) já deve ser as proporções (ex: 0.301)
-        benford_pct = benford_dist[d - 1] * 100
-        diff = obs_pct - benford_pct
-
-        data.append([
-            str(d),
-            f"{obs_count:,.0f}",  # Formatando contagem
-            f"{obs_pct:.2f}%",
-            f"{benford_pct:.2f}%",
-            f"{diff:+.2f}%"
-        ])
+    # observed_counts: array de 9 posições com as contagens dos dígitos 1-9, já na ordem da tabela
+    obs_arr = np.asarray(observed_counts, dtype=np.int64)
+    # Calcular porcentagens e diferenças com base no total_count passado (registros válidos);
+    # com total_count == 0 as porcentagens ficam em zero
+    obs_pct_arr = np.divide(obs_arr * 100.0, total_count, out=np.zeros(9), where=total_count > 0)
+    # A distribuição de Benford (benford_dist) já deve ser as proporções (ex: 0.301)
+    exp_pct_arr = np.asarray(benford_dist, dtype=np.float64) * 100.0
+    diff_arr = obs_pct_arr - exp_pct_arr
+    # Os mesmos arrays alimentam a tabela e o gráfico abaixo
+
+    # Células formatadas por coluna com np.char.mod (a contagem mantém o separador de milhar,
+    # que a formatação estilo printf não oferece)
+    digits = np.arange(1, len(obs_arr) + 1)
+    data.extend(zip(
+        np.char.mod('%d', digits).tolist(),
+        [f"{o:,}" for o in obs_arr.tolist()],
+        np.char.mod('%.2f%%', obs_pct_arr).tolist(),
+        np.char.mod('%.2f%%', exp_pct_arr).tolist(),
+        np.char.mod('%+.2f%%', diff_arr).tolist(),
+    ))
     try:
         # 1. Criar um gráfico com matplotlib (ou salvar o gráfico do Streamlit)
         fig, ax = plt.subplots(figsize=(8, 4))
-        digits = list(range(1, 10))
-        ax.bar(digits, [observed_counts.get(d, 0) / total_count * 100 for d in digits], alpha=0.7, label='Observado')
-        ax.plot(digits, [benford_dist[d - 1] * 100 for d in digits], 'r--', label='Benford')
+        ax.bar(digits, obs_pct_arr, alpha=0.7, label='Observado')
+        ax.plot(digits, exp_pct_arr, 'r--', label='Benford')
         ax.set_xlabel('Primeiro Dígito')
         ax.set_ylabel('Frequência (%)')
         ax.legend()
 
-        # 2. Salvar em um arquivo temporário
-        with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as tmpfile:
-            fig.savefig(tmpfile.name, dpi=150, bbox_inches='tight')
-            plt.close(fig)  # Fechar a figura para liberar memória
+        # 2. Renderizar o PNG em memória (sem arquivo temporário em disco, que ficava sem ser removido)
+        chart_buffer = BytesIO()
+        fig.savefig(chart_buffer, format='png', dpi=150, bbox_inches='tight')
+        plt.close(fig)  # Fechar a figura para liberar memória
+        chart_buffer.seek(0)
 
-            # 3. Adicionar ao PDF
-            elements.append(Spacer(1, 12))
-            elements.append(Paragraph("Comparação Observado vs. Esperado:", subtitle_style))
-            elements.append(Image(tmpfile.name, width=400, height=250))
+        # 3. Adicionar ao PDF como uma única imagem rasterizada
+        elements.append(Spacer(1, 12))
+        elements.append(Paragraph("Comparação Observado vs. Esperado:", subtitle_style))
+        elements.append(Image(chart_buffer, width=400, height=250))
     except Exception as e:
         elements.append(Paragraph("Erro ao gerar gráfico: " + str(e), normal_style))
     # Criar e estilizar a tabela
     table = Table(data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),  # Cor para as linhas de dados
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    table.setStyle(table_style)
 
     elements.append(table)
     elements.append(Spacer(1, 12))
 
     # Informações sobre a Lei de Benford (existente)
     elements.append(Paragraph("Sobre a Lei de Benford:", subtitle_style))
-    elements.append(Paragraph("""
+    # Texto estático sem marcação: Preformatted evita o parser de markup do Paragraph e preserva as quebras de linha
+    elements.append(Preformatted(textwrap.dedent("""
     A Lei de Benford (também conhecida como Lei do Primeiro Dígito) é um fenômeno matemático
     que descreve a distribuição de frequência do primeiro dígito em muitos conjuntos de dados do mundo real.
     De acordo com esta lei, o dígito 1 aparece como o primeiro dígito em cerca
@@ -314,7 +574,7 @@ def create_pdf(observed_counts, benford_dist, chi2, p_value, total_count, column
     SAD: "Soma total das diferenças absolutas. Valores acima de 10% são críticos."
     As métricas MAD (Mean Absolute Deviation) e SAD (Sum of Absolute Differences) fornecem
     uma medida do tamanho total do desvio em relação à distribuição esperada.
-    """, normal_style))  # Adicionada menção a MAD/SAD
+    """).strip(), normal_style, maxLineLength=90, splitChars=' '))  # Adicionada menção a MAD/SAD
     # Conclusão com estilo personalizado
     elements.append(Paragraph("Conclusão:", styles['Heading2']))
     conclusion_style = styles['ConclusaoAlerta'] if mad >= 0.010 else styles['Normal']
@@ -322,9 +582,189 @@ def create_pdf(observed_counts, benford_dist, chi2, p_value, total_count, column
     # Gerar o PDF
     # No final, ao construir o PDF:
     doc.build(elements, onFirstPage=add_header, onLaterPages=add_footer)
-    return buffer
+    # Retornar apenas os bytes; o BytesIO de trabalho é fechado e liberado imediatamente
+    pdf_bytes = buffer.getvalue()
+    buffer.close()
+    return pdf_bytes
+
+
+# Função para gerar o relatório PDF com cache
+# O build do reportlab (layout, gráfico, tabela) roda uma única vez por resultado de análise distinto
+@st.cache_data(show_spinner=False, max_entries=16)
+def build_pdf_report(observed_counts, total_count, column_name, chi2, p_value, mad, sad):
+    """
+    Gera o relatório PDF da análise e retorna seu conteúdo em bytes.
+    observed_counts é o array de 9 posições com as contagens observadas dos dígitos 1-9.
+    """
+    return create_pdf(
+        observed_counts=observed_counts,
+        chi2=chi2,
+        p_value=p_value,
+        total_count=total_count,
+        column_name=column_name,
+        mad=mad,
+        sad=sad
+    )
+
+
+# Função para contar os primeiros dígitos de uma coluna já carregada em memória
+# Em cache: repetir a análise da mesma coluna com os mesmos filtros reutiliza as contagens, sem
+# refazer a extração dos dígitos sobre a coluna inteira.
+@st.cache_data(show_spinner=False, max_entries=16, hash_funcs={pd.Series: _exact_pandas_hash})
+def analyze_column(series, remove_zeros, remove_negatives):
+    """
+    Retorna as contagens dos primeiros dígitos 1-9 (array de 9 posições) da coluna, após os filtros,
+    e o total de registros da coluna antes de filtrar.
+    """
+    total_rows = len(series)  # Total na coluna antes de filtrar
+
+    # Se não remover negativos, talvez usar abs()? Decidi não forçar abs() por padrão,
+    # deixando como opção ou mantendo o filtro de negativos. A extração de dígitos já usa abs().
+    # bool também é numeric_dtype no pandas, mas True/False não são valores (extract_first_digit
+    # os ignora); colunas booleanas seguem pelo fallback e não contam dígitos
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        # Caminho vetorizado (caso comum após normalize_dataframe): a coluna é extraída uma
+        # única vez como array contíguo (float64), já sem nulos e filtrada, e a extração
+        # opera direto sobre esse buffer, sem o alinhamento de índice do pandas.
+        observed = count_first_digits(filtered_column_values(series, remove_zeros, remove_negatives))
+    else:
+        # Fallback: aplicar filtros e a função robusta apenas aos valores não-NaN
+        if remove_zeros:
+            series = series[series != 0]
+        if remove_negatives:
+            series = series[series > 0]
+        first_digits = series.dropna().apply(extract_first_digit).dropna()
+        observed = np.bincount(first_digits.to_numpy(dtype=np.intp), minlength=10)[1:10]
+
+    # observed: contagens dos dígitos 1-9 (array de 9 posições, com 0 se não apareceram)
+    return observed, total_rows
+
+
+# Funções de leitura de arquivos com cache
+# O Streamlit reexecuta o script inteiro a cada interação; o cache (chaveado pelo conteúdo do arquivo)
+# evita reler e reprocessar o arquivo a cada clique em um widget. Os caches que guardam DataFrames
+# inteiros mantêm poucas entradas, para que uploads sucessivos não acumulem arquivos na memória.
+@st.cache_data(show_spinner=False, max_entries=4)
+def read_csv_file(file_bytes, nrows=None):
+    """
+    Lê um arquivo CSV, primeiro com o parser multithread do pyarrow (UTF-8) e, em caso de falha,
+    com o parser padrão do pandas tentando diferentes encodings.
+    Com nrows, lê apenas as primeiras linhas (o engine pyarrow não suporta nrows).
+    Retorna o DataFrame e o encoding utilizado, ou (None, None) se nenhum funcionar.
+    """
+    # Caminho rápido: engine 'pyarrow' (o pyarrow já é dependência do Streamlit)
+    if nrows is None:
+        try:
+            df = pd.read_csv(BytesIO(file_bytes), engine='pyarrow')
+            return df, 'utf-8'
+        except Exception:
+            pass
+
+    encodings = ['utf-8', 'latin-1', 'ISO-8859-1', 'cp1252']
+    for encoding in encodings:
+        try:
+            df = pd.read_csv(BytesIO(file_bytes), encoding=encoding, nrows=nrows)
+            return df, encoding
+        except Exception:
+            continue
+    return None, None
 
 
+@st.cache_data(show_spinner=False, max_entries=16)
+def count_first_digits_csv(file_bytes, encoding, column, skip_rows, drop_empty_rows, remove_zeros, remove_negatives):
+    """
+    Conta os primeiros dígitos de uma coluna de um CSV grande lendo o arquivo em blocos,
+    sem materializar o arquivo inteiro como DataFrame.
+    Aplica por bloco o mesmo preprocessamento da visualização (linhas iniciais puladas e, se
+    drop_empty_rows, remoção das linhas completamente vazias).
+    Retorna as contagens dos dígitos 1-9 e o total de registros lidos na coluna.
+    """
+    counts = np.zeros(9, dtype=np.int64)
+    total_rows = 0
+
+    # skiprows a partir da linha 1 preserva o cabeçalho (equivale a df.iloc[skip_rows:]).
+    # Linhas vazias dependem de todas as colunas, então só nesse caso o arquivo é lido inteiro.
+    # float_precision='round_trip': mesmo valor que o parser pyarrow usado na leitura completa.
+    reader = pd.read_csv(BytesIO(file_bytes), encoding=encoding, usecols=None if drop_empty_rows else [column],
+                         skiprows=range(1, skip_rows + 1), chunksize=CSV_CHUNK_ROWS,
+                         float_precision='round_trip')
+    for chunk in reader:
+        if drop_empty_rows:
+            chunk = chunk.dropna(how='all')
+
+        # O tipo é decidido por bloco, não pela amostra: um bloco com texto (ex.: "R$ 1.234,56")
+        # recebe a mesma conversão aplicada por normalize_dataframe às colunas de texto
+        if pd.api.types.is_bool_dtype(chunk[column]):
+            # Bloco só com True/False: nenhum valor numérico (mesma regra de analyze_column)
+            values = np.full(len(chunk), np.nan)
+        elif pd.api.types.is_numeric_dtype(chunk[column]):
+            values = chunk[column].to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            values = coerce_numeric_text(chunk[column]).to_numpy()
+        total_rows += len(values)
+
+        # Filtros combinados em uma única máscara booleana
+        mask = np.isfinite(values)
+        if remove_zeros:
+            mask &= values != 0
+        if remove_negatives:
+            mask &= values > 0
+
+        counts += count_first_digits(values[mask])
+
+    return counts, total_rows
+
+
+@st.cache_data(show_spinner=False, max_entries=16)
+def list_excel_sheets(file_bytes):
+    """
+    Retorna o primeiro engine capaz de abrir o arquivo Excel e os nomes das suas planilhas,
+    ou (None, []) se nenhum engine disponível conseguir ler o arquivo.
+    """
+    excel_engines = ['openpyxl', 'xlrd', 'pyxlsb']  # Ordem de preferência
+    for engine_name in excel_engines:
+        try:
+            xls = pd.ExcelFile(BytesIO(file_bytes), engine=engine_name)
+            return engine_name, xls.sheet_names
+        except ImportError:
+            # Ignora se o engine não está instalado, tenta o próximo
+            continue
+        except Exception:
+            # Captura outros erros de leitura para este engine e tenta o próximo
+            continue
+    return None, []
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def read_excel_file(file_bytes, sheet_name, engine):
+    """
+    Lê uma planilha de um arquivo Excel/ODS com o engine informado.
+    """
+    return pd.read_excel(BytesIO(file_bytes), sheet_name=sheet_name, engine=engine)
+
+
+# Gráfico da distribuição teórica para a aba "Sobre" (conteúdo fixo: construído uma vez por processo)
+@st.cache_resource(show_spinner=False)
+def benford_info_figure():
+    """
+    Gráfico de barras com a probabilidade esperada de cada primeiro dígito, em porcentagem.
+    """
+    benford_data = pd.DataFrame({
+        'Dígito': range(1, 10),
+        'Probabilidade (%)': BENFORD_PCT
+    })
+
+    fig_benford = px.bar(benford_data, x='Dígito', y='Probabilidade (%)',
+                         title='Distribuição de Benford (Lei do Primeiro Dígito)',
+                         labels={'Probabilidade (%)': 'Frequência Esperada (%)'},
+                         color_discrete_sequence=['#52BCA3'])
+
+    fig_benford.update_layout(
+        xaxis=dict(tickmode='linear', tick0=1, dtick=1),
+        yaxis=dict(range=[0, 35])
+    )
+
+    return fig_benford
 
 
 # Interface do usuário em abas
@@ -342,23 +782,25 @@ with tab1:
         try:
             # Obter a extensão do arquivo
             file_extension = uploaded_file.name.split('.')[-1].lower()
+            # Conteúdo do arquivo (usado também como chave do cache de leitura)
+            file_bytes = uploaded_file.getvalue()
 
             df = None  # Inicializa df como None
+            # CSV grande: análise lida em blocos diretamente do arquivo
+            is_large_csv = file_extension == 'csv' and len(file_bytes) > LARGE_CSV_BYTES
 
             # Lógica para ler diferentes tipos de arquivo
             if file_extension == 'csv':
-                # Tentar diferentes encodings para CSV (seu código existente)
-                encodings = ['utf-8', 'latin-1', 'ISO-8859-1', 'cp1252']
-                for encoding in encodings:
-                    try:
-                        uploaded_file.seek(0)  # Volta o ponteiro para o início para cada tentativa
-                        df = pd.read_csv(uploaded_file, encoding=encoding)
-                        # --- INSERIR WORKAROUND DA CÓPIA AQUI (CSV) ---
-                        df = pd.DataFrame(df.values, columns=df.columns, index=df.index)
-                        st.success(f"Arquivo CSV lido com codificação {encoding}")
-                        break
-                    except Exception:
-                        continue
+                # Tentar diferentes encodings para CSV
+                df, encoding = read_csv_file(file_bytes, nrows=CSV_PREVIEW_ROWS if is_large_csv else None)
+                if df is not None:
+                    st.success(f"Arquivo CSV lido com codificação {encoding}")
+                    if is_large_csv:
+                        st.info(f"Arquivo grande ({len(file_bytes) / 1024 ** 2:.0f} MB): a visualização e a "
+                                f"detecção de colunas usam as primeiras {CSV_PREVIEW_ROWS:,} linhas; a análise "
+                                f"lê o arquivo completo em blocos de {CSV_CHUNK_ROWS:,} linhas, aplicando a "
+                                f"cada bloco as linhas puladas e a remoção de linhas vazias. Valores de texto "
+                                f"após a amostra são convertidos como em uma coluna de texto.")
 
                 if df is None or df.empty:
                     st.error("Não foi possível ler o arquivo CSV. Tente converter para Excel ou um encoding diferente.")
@@ -368,29 +810,14 @@ with tab1:
             elif file_extension in ['xlsx', 'xls']:
                 try:
                     # Para Excel, tentamos múltiplos engines para compatibilidade
-                    excel_engines = ['openpyxl', 'xlrd', 'pyxlsb']  # Ordem de preferência
-                    read_success = False
+                    engine_name, sheet_names = list_excel_sheets(file_bytes)
 
-                    for engine_name in excel_engines:
-                        try:
-                            uploaded_file.seek(0)
-                            xls = pd.ExcelFile(uploaded_file, engine=engine_name)
-                            sheet_name = st.selectbox("Selecione a planilha:", xls.sheet_names)
-                            df = pd.read_excel(uploaded_file, sheet_name=sheet_name, engine=engine_name)
-
-                            # Aplicar workaround de cópia
-                            df = pd.DataFrame(df.values, columns=df.columns, index=df.index)
-                            st.success(f"Arquivo Excel lido com engine '{engine_name}'.")
-                            read_success = True
-                            break  # Sai do loop se conseguir ler
-                        except ImportError:
-                            # Ignora se o engine não está instalado, tenta o próximo
-                            continue
-                        except Exception as e:
-                            # Captura outros erros de leitura para este engine e tenta o próximo
-                            continue
+                    if engine_name is not None:
+                        sheet_name = st.selectbox("Selecione a planilha:", sheet_names)
+                        df = read_excel_file(file_bytes, sheet_name, engine_name)
+                        st.success(f"Arquivo Excel lido com engine '{engine_name}'.")
 
-                    if not read_success or df is None or df.empty:
+                    if df is None or df.empty:
                         st.error("Não foi possível ler o arquivo Excel com nenhum engine disponível.")
                         st.stop()
 
@@ -401,13 +828,10 @@ with tab1:
             # Lógica para ler arquivos ODS (.ods)
             elif file_extension == 'ods':
                 try:
-                    uploaded_file.seek(0)
-                    # Tente ler diretamente
-                    df = pd.read_excel(uploaded_file, engine='odf')
+                    # Tente ler diretamente (primeira planilha)
+                    df = read_excel_file(file_bytes, 0, 'odf')
 
                     # Se chegou aqui, a leitura foi bem-sucedida
-                    # Aplicar workaround de cópia
-                    df = pd.DataFrame(df.values, columns=df.columns, index=df.index)
                     st.success("Arquivo ODS lido com sucesso.")
 
                 except ImportError:
@@ -440,7 +864,8 @@ with tab1:
                     st.write(f"Ignoradas {skip_rows} linhas iniciais.")
 
                 # Opção para remover linhas com valores nulos em *todas* as colunas
-                if st.checkbox("Remover linhas completamente vazias"):
+                drop_empty_rows = st.checkbox("Remover linhas completamente vazias")
+                if drop_empty_rows:
                     old_len = len(df)
                     df = df.dropna(how='all')
                     st.write(f"Removidas {old_len - len(df)} linhas vazias.")
@@ -478,67 +903,55 @@ with tab1:
             # Botão para iniciar análise
             if st.button(" Iniciar Análise de Benford"):
                 with st.spinner("Analisando dados..."):
-                    # Preparar dados para análise - usar df_clean que contém colunas numéricas tratadas
-                    analysis_data_series = df_clean[col].copy()
-
-                    # Aplicar filtros conforme opções
-                    if remove_zeros:
-                        analysis_data_series = analysis_data_series[analysis_data_series != 0]
-                    if remove_negatives:
-                        analysis_data_series = analysis_data_series[analysis_data_series > 0]
-                    # Se não remover negativos, talvez usar abs()? Decidi não forçar abs() por padrão,
-                    # deixando como opção ou mantendo o filtro de negativos. A função extract_first_digit já usa abs().
-
-                    # Extrair primeiros dígitos usando a função robusta
-                    # Aplicar extract_first_digit apenas aos valores não-NaN
-                    first_digits = analysis_data_series.dropna().apply(extract_first_digit).dropna()
-
-                    if len(first_digits) < 100:  # Um número razoável de dados para análise significativa
+                    if is_large_csv:
+                        # CSV grande: contar os dígitos lendo o arquivo completo em blocos
+                        # (colunas '_numeric' são lidas da coluna de texto original e convertidas por bloco)
+                        source_col = col if col in df.columns else col[:-len('_numeric')]
+                        observed, total_rows = count_first_digits_csv(
+                            file_bytes, encoding, source_col, skip_rows, drop_empty_rows,
+                            remove_zeros, remove_negatives)
+                    else:
+                        # Preparar dados para análise - usar df_clean que contém colunas numéricas tratadas
+                        observed, total_rows = analyze_column(df_clean[col], remove_zeros, remove_negatives)
+
+                    # Registros após filtros e extração bem sucedida
+                    total_observed = observed.sum()
+
+                    if total_observed < 100:  # Um número razoável de dados para análise significativa
                         st.error(
-                            f"Dados insuficientes para análise de Benford após filtragem ({len(first_digits)} registros válidos). Recomenda-se pelo menos ~100 registros.")
+                            f"Dados insuficientes para análise de Benford após filtragem ({total_observed} registros válidos). Recomenda-se pelo menos ~100 registros.")
                         st.stop()  # Parar se não houver dados suficientes
 
                     # Mostrar estatísticas básicas
                     st.subheader("Estatísticas Básicas")
                     stats_col1, stats_col2, stats_col3 = st.columns(3)
                     stats_col1.metric("Total de registros na coluna",
-                                      f"{len(df_clean[col]):,}")  # Total na coluna antes de filtrar
+                                      f"{total_rows:,}")  # Total na coluna antes de filtrar
                     stats_col2.metric("Registros válidos para análise",
-                                      f"{len(first_digits):,}")  # Registros após filtros e extração bem sucedida
+                                      f"{total_observed:,}")  # Registros após filtros e extração bem sucedida
                     stats_col3.metric("Registros ignorados/inválidos",
-                                      f"{len(df_clean[col]) - len(first_digits):,}")  # Diferença
-
-                    # Contagem de dígitos observados
-                    observed = first_digits.value_counts().sort_index()
-
-                    # Garantir que todos os dígitos de 1 a 9 estejam representados (com contagem 0 se não apareceram)
-                    for d in range(1, 10):
-                        if d not in observed.index:
-                            observed[d] = 0
-                    observed = observed.sort_index()
+                                      f"{total_rows - total_observed:,}")  # Diferença
 
                     # Verificar se há dados válidos para os dígitos 1-9 (total_observed)
-                    total_observed = observed.sum()
-                    if total_observed == 0:  # Redundante se já checamos len(first_digits) > 0, mas boa prática
+                    if total_observed == 0:  # Redundante após a checagem de mínimo acima, mas boa prática
                         st.error("Não foram encontrados dígitos válidos (1-9) para análise após a extração!")
                         st.stop()
 
-                    # Distribuição esperada de Benford (em proporções)
-                    benford_proportions = np.log10(1 + 1 / np.arange(1, 10))
-                    expected_counts = benford_proportions * total_observed
+                    # Distribuição esperada de Benford (em contagens)
+                    expected_counts = BENFORD_PROPORTIONS * total_observed
 
                     # Teste chi-quadrado - Usar apenas dígitos com frequências esperadas > 0
-                    # O teste chi-quadrado padrão do scipy (chisquare) lida bem com zeros observados,
-                    # mas espera frequências esperadas > 0. Scipy recomenda exp > 5 para um bom ajuste.
+                    # O teste chi-quadrado lida bem com zeros observados, mas exige frequências
+                    # esperadas > 0. Recomenda-se exp > 5 para um bom ajuste.
                     # Vamos filtrar exp > 0 para evitar erros, mas alertar sobre baixa contagem esperada.
-                    valid_digits_for_chi2 = [d for d in range(1, 10) if
-                                             expected_counts[d - 1] > 0]  # Todos os dígitos 1-9 terão exp > 0
-                    valid_obs_for_chi2 = [observed.get(d, 0) for d in valid_digits_for_chi2]
-                    valid_exp_for_chi2 = [expected_counts[d - 1] for d in valid_digits_for_chi2]
+                    # Máscaras NumPy sobre os 9 dígitos, sem laços Python
+                    digits = np.arange(1, 10)
+                    valid_for_chi2 = expected_counts > 0  # Todos os dígitos 1-9 terão exp > 0
+                    valid_obs_for_chi2 = observed[valid_for_chi2]
+                    valid_exp_for_chi2 = expected_counts[valid_for_chi2]
 
                     # Alerta se frequências esperadas são baixas para alguns dígitos (compromete o teste Chi²)
-                    low_expected_count_digits = [d for d in range(1, 10) if
-                                                 expected_counts[d - 1] < 5 and expected_counts[d - 1] > 0]
+                    low_expected_count_digits = digits[valid_for_chi2 & (expected_counts < 5)].tolist()
                     if low_expected_count_digits:
                         st.warning(f"""
                          Atenção: As frequências esperadas para os dígitos {low_expected_count_digits} são menores que 5.
@@ -552,7 +965,7 @@ with tab1:
                             "Dados insuficientes com frequência esperada > 0 para realizar o teste estatístico Chi-Quadrado.")
                     else:
                         try:
-                            chi2, p = chisquare(valid_obs_for_chi2, valid_exp_for_chi2)
+                            chi2, p = benford_chi2(valid_obs_for_chi2, valid_exp_for_chi2)
                         except Exception as e:
                             st.error(f"Erro ao calcular o teste Chi-Quadrado: {str(e)}")
                             chi2 = float('nan')
@@ -561,17 +974,18 @@ with tab1:
                     # Calcular métricas de diferença
                     # MAD (Mean Absolute Deviation) - média dos desvios absolutos
                     observed_proportions = observed / total_observed
-                    abs_diff = np.zeros(9)
-                    for i in range(1, 10):
-                        obs_prop = observed_proportions.get(i, 0)
-                        benford_prop = benford_proportions[i - 1]
-                        abs_diff[i - 1] = abs(obs_prop - benford_prop)
+                    abs_diff = np.abs(observed_proportions - BENFORD_PROPORTIONS)
 
-                    # Calcular MAD (Mean Absolute Deviation - Desvio Absoluto Médio)
-                    mad = np.mean(abs_diff)
+                    # Porcentagens usadas nos gráficos e na tabela (calculadas uma única vez)
+                    obs_pct = observed_proportions * 100
+                    diff_pp = obs_pct - BENFORD_PCT  # Diferença em pontos percentuais
 
                     # Calcular SAD (Sum of Absolute Differences - Soma das Diferenças Absolutas)
-                    sad = np.sum(abs_diff)
+                    sad = float(abs_diff.sum())
+
+                    # Calcular MAD (Mean Absolute Deviation - Desvio Absoluto Médio): MAD = SAD / 9,
+                    # uma única redução e sem divergência de arredondamento entre as duas métricas
+                    mad = sad / 9.0
 
                     # Definir limiares para MAD (baseados na literatura)
                     mad_threshold_close = 0.0015  # Aproximadamente conforme
@@ -583,16 +997,16 @@ with tab1:
                     st.subheader("Resultados Estatísticos")
 
                     stat_cols = st.columns([1, 1, 1, 1])
-                    stat_cols[0].metric("Estatística Chi²", f"{chi2:.4f}" if not np.isnan(chi2) else "N/A")
-                    stat_cols[1].metric("Valor-p", f"{p:.4f}" if not np.isnan(p) else "N/A")
-                    stat_cols[2].metric("MAD", f"{mad * 100:.2f}%" if not np.isnan(mad) else "N/A")
-                    stat_cols[3].metric("SAD", f"{sad * 100:.2f}%" if not np.isnan(sad) else "N/A")
+                    stat_cols[0].metric("Estatística Chi²", f"{chi2:.4f}" if not math.isnan(chi2) else "N/A")
+                    stat_cols[1].metric("Valor-p", f"{p:.4f}" if not math.isnan(p) else "N/A")
+                    stat_cols[2].metric("MAD", f"{mad * 100:.2f}%" if not math.isnan(mad) else "N/A")
+                    stat_cols[3].metric("SAD", f"{sad * 100:.2f}%" if not math.isnan(sad) else "N/A")
 
                     # Interpretação dos resultados
                     st.subheader("Interpretação dos Resultados")
 
                     # Classificar o resultado com base no valor-p e MAD
-                    if not np.isnan(p) and not np.isnan(mad):
+                    if not math.isnan(p) and not math.isnan(mad):
                         if p < 0.05:  # Estatisticamente significativo
                             if mad >= mad_threshold_suspect:
                                 st.error(
@@ -626,25 +1040,28 @@ with tab1:
                     # Visualização: Gráfico de barras
                     st.subheader("Visualização Comparativa")
 
-                    # Preparação dos dados para visualização
-                    viz_data = pd.DataFrame({
-                        'Dígito': range(1, 10),
-                        'Observado (%)': [observed_proportions.get(d, 0) * 100 for d in range(1, 10)],
-                        'Esperado (%)': benford_proportions * 100
+                    # Dados por dígito em um único DataFrame, compartilhado pelos gráficos e pela tabela
+                    results = pd.DataFrame({
+                        'Dígito': np.arange(1, 10),
+                        'Contagem': observed,
+                        'Observado (%)': obs_pct,
+                        'Esperado (%)': BENFORD_PCT,
+                        'Diferença (p.p.)': diff_pp
                     })
 
                     # Criar o gráfico de barras
-                    fig = px.bar(viz_data, x='Dígito', y=['Observado (%)', 'Esperado (%)'],
+                    fig = px.bar(results, x='Dígito', y=['Observado (%)', 'Esperado (%)'],
                                  barmode='group', title='Distribuição dos Primeiros Dígitos',
                                  labels={'value': 'Porcentagem (%)', 'variable': 'Distribuição'},
                                  color_discrete_sequence=['#5D69B1', '#52BCA3'])
 
                     # Adicionar linha horizontal para p-value
-                    if not np.isnan(p):
+                    if not math.isnan(p):
+                        annotation_text = f"Valor-p: {p:.4f} | MAD: {mad * 100:.2f}%"
                         fig.add_annotation(
                             xref="paper", yref="paper",
                             x=0.5, y=1.05,
-                            text=f"Valor-p: {p:.4f} | MAD: {mad * 100:.2f}%",
+                            text=annotation_text,
                             showarrow=False,
                             font=dict(size=14)
                         )
@@ -654,13 +1071,6 @@ with tab1:
                     # Visualização: Linha de discrepância
                     st.subheader("Gráfico de Discrepância")
 
-                    # Calcular diferenças
-                    diff_data = pd.DataFrame({
-                        'Dígito': range(1, 10),
-                        'Diferença (Obs - Esp) %': [(observed_proportions.get(d, 0) - benford_proportions[d - 1]) * 100
-                                                    for d in range(1, 10)]
-                    })
-
                     # Criar gráfico de linha/área para destacar discrepâncias
                     fig_diff = go.Figure()
 
@@ -675,9 +1085,9 @@ with tab1:
 
                     # Adicionar barras de diferença
                     fig_diff.add_trace(go.Bar(
-                        x=diff_data['Dígito'],
-                        y=diff_data['Diferença (Obs - Esp) %'],
-                        marker_color=['red' if diff < 0 else 'green' for diff in diff_data['Diferença (Obs - Esp) %']],
+                        x=results['Dígito'],
+                        y=results['Diferença (p.p.)'],
+                        marker_color=np.where(diff_pp < 0, 'red', 'green'),
                         name='Discrepância'
                     ))
 
@@ -693,46 +1103,37 @@ with tab1:
                     # Tabela detalhada
                     st.subheader("Tabela Detalhada")
 
-                    # Criar tabela de resultados
-                    result_table = pd.DataFrame({
-                        'Dígito': range(1, 10),
-                        'Contagem': [observed.get(d, 0) for d in range(1, 10)],
-                        'Observado (%)': [observed_proportions.get(d, 0) * 100 for d in range(1, 10)],
-                        'Esperado (%)': benford_proportions * 100,
-                        'Diferença (p.p.)': [(observed_proportions.get(d, 0) - benford_proportions[d - 1]) * 100 for d
-                                             in range(1, 10)]
-                    })
-
-                    # Formatação da tabela
-                    result_table['Contagem'] = result_table['Contagem'].map('{:,.0f}'.format)
-                    result_table['Observado (%)'] = result_table['Observado (%)'].map('{:.2f}%'.format)
-                    result_table['Esperado (%)'] = result_table['Esperado (%)'].map('{:.2f}%'.format)
-                    result_table['Diferença (p.p.)'] = result_table['Diferença (p.p.)'].map('{:+.2f}'.format)
-
-                    st.dataframe(result_table, hide_index=True)
+                    # A tabela mantém as colunas numéricas; a formatação é aplicada apenas na exibição
+                    st.dataframe(
+                        results,
+                        hide_index=True,
+                        column_config={
+                            'Contagem': st.column_config.NumberColumn(format='%d'),
+                            'Observado (%)': st.column_config.NumberColumn(format='%.2f%%'),
+                            'Esperado (%)': st.column_config.NumberColumn(format='%.2f%%'),
+                            'Diferença (p.p.)': st.column_config.NumberColumn(format='%+.2f'),
+                        }
+                    )
 
                     # Gerar PDF do relatório
                     st.subheader("Exportar Relatório")
 
-                    # Crie um dicionário para mapear índices para contagens observadas
-                    observed_counts_dict = {d: observed.get(d, 0) for d in range(1, 10)}
-
-                    # Gerar PDF
-                    pdf_buffer = create_pdf(
-                        observed_counts=observed_counts_dict,
-                        benford_dist=benford_proportions,
-                        chi2=chi2,
-                        p_value=p,
-                        total_count=total_observed,
+                    # Gerar PDF (reutilizado do cache se o resultado da análise não mudou; o array de
+                    # contagens é passado diretamente e faz parte da chave do cache)
+                    pdf_bytes = build_pdf_report(
+                        observed_counts=observed,
+                        total_count=int(total_observed),
                         column_name=col,
-                        mad=mad,
-                        sad=sad
+                        chi2=float(chi2),
+                        p_value=float(p),
+                        mad=float(mad),
+                        sad=float(sad)
                     )
 
                     # Botão para download do PDF
                     st.download_button(
                         label="📥 Baixar Relatório PDF",
-                        data=pdf_buffer.getvalue(),
+                        data=pdf_bytes,
                         file_name=f"relatorio_benford_{col}.pdf",
                         mime="application/pdf"
                     )
@@ -808,24 +1209,8 @@ with tab1:
         # Adicionar visualização da distribuição de Benford
         st.subheader("Visualização da Lei de Benford")
 
-        # Criar dados para visualização
-        benford_data = pd.DataFrame({
-            'Dígito': range(1, 10),
-            'Probabilidade (%)': np.log10(1 + 1 / np.arange(1, 10)) * 100
-        })
-
         # Gráfico da Lei de Benford
-        fig_benford = px.bar(benford_data, x='Dígito', y='Probabilidade (%)',
-                             title='Distribuição de Benford (Lei do Primeiro Dígito)',
-                             labels={'Probabilidade (%)': 'Frequência Esperada (%)'},
-                             color_discrete_sequence=['#52BCA3'])
-
-        fig_benford.update_layout(
-            xaxis=dict(tickmode='linear', tick0=1, dtick=1),
-            yaxis=dict(range=[0, 35])
-        )
-
-        st.plotly_chart(fig_benford, use_container_width=True)
+        st.plotly_chart(benford_info_figure(), use_container_width=True)
 
         st.info("""
             **Fórmula da Lei de Benford**: 
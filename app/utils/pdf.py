@@ -1,15 +1,37 @@
+import functools
 from io import BytesIO
-from reportlab.lib import colors
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+import numpy as np
+# reportlab é importado apenas quando um relatório é gerado (ver _pdf_styles e create_pdf),
+# evitando o custo de inicialização no carregamento do módulo
+
+
+# Folha de estilos e estilo da tabela construídos uma única vez, no primeiro relatório gerado
+@functools.lru_cache(maxsize=None)
+def _pdf_styles():
+    from reportlab.lib import colors
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.platypus import TableStyle
+
+    table_style = TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),  # Cor para as linhas de dados
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+    return getSampleStyleSheet(), table_style
 
 def create_pdf(observed_counts, benford_dist, chi2, p_value, total_count, column_name, mad, sad):
+    from reportlab.lib.pagesizes import letter
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table
+
     buffer = BytesIO()
     doc = SimpleDocTemplate(buffer, pagesize=letter)
     elements = []
 
-    styles = getSampleStyleSheet()
+    styles, table_style = _pdf_styles()
     # Estilos básicos
     title_style = styles['Heading1']
     subtitle_style = styles['Heading2']
@@ -64,33 +86,26 @@ def create_pdf(observed_counts, benford_dist, chi2, p_value, total_count, column
     data = [["Dígito", "Contagem", "Observado (%)", "Esperado (%)", "Diferença (%)"]]
 
     # Garantir que os dados da tabela estejam na ordem correta e completos (dígitos 1-9)
-    for d in range(1, 10):
-        obs_count = observed_counts.get(d, 0)
-        # Calcular porcentagens e diferenças com base no total_count passado (registros válidos)
-        obs_pct = (obs_count / total_count) * 100 if total_count > 0 else 0
-        # A distribuição de Benford (benford_dist) já deve ser as proporções (ex: 0.301)
-        benford_pct = benford_dist[d - 1] * 100
-        diff = obs_pct - benford_pct
-
+    # observed_counts: array de 9 posições com as contagens dos dígitos 1-9
+    obs_counts = np.asarray(observed_counts, dtype=np.int64)
+    # Calcular porcentagens e diferenças com base no total_count passado (registros válidos)
+    obs_pct = obs_counts / total_count * 100.0 if total_count > 0 else np.zeros(9)
+    # A distribuição de Benford (benford_dist) já deve ser as proporções (ex: 0.301); convertida uma única vez
+    benford_pct = np.asarray(benford_dist, dtype=np.float64) * 100.0
+    diff = obs_pct - benford_pct
+
+    for d, o, op, bp, df in zip(range(1, 10), obs_counts.tolist(), obs_pct.tolist(), benford_pct.tolist(), diff.tolist()):
         data.append([
             str(d),
-            f"{obs_count:,.0f}",  # Formatando contagem
-            f"{obs_pct:.2f}%",
-            f"{benford_pct:.2f}%",
-            f"{diff:+.2f}%"
+            f"{o:,.0f}",  # Formatando contagem
+            f"{op:.2f}%",
+            f"{bp:.2f}%",
+            f"{df:+.2f}%"
         ])
 
     # Criar e estilizar a tabela
     table = Table(data)
-    table.setStyle(TableStyle([
-        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),  # Cor para as linhas de dados
-        ('GRID', (0, 0), (-1, -1), 1, colors.black)
-    ]))
+    table.setStyle(table_style)
 
     elements.append(table)
     elements.append(Spacer(1, 12))
@@ -1,12 +1,18 @@
 from supabase import create_client, Client
 import streamlit as st
 
-def supabase_client():
+# Um único cliente por processo, reutilizado entre reruns e sessões
+# (exceções não são armazenadas no cache: uma falha de conexão é tentada novamente na próxima chamada)
+@st.cache_resource
+def _cached_client() -> Client:
+    return create_client(
+        st.secrets["SUPABASE_URL"],
+        st.secrets["SUPABASE_KEY"]
+    )
+
+def supabase_client() -> Client | None:
     try:
-        return create_client(
-            st.secrets["SUPABASE_URL"],
-            st.secrets["SUPABASE_KEY"]
-        )
+        return _cached_client()
     except Exception as e:
         st.error(f"Erro na conexão com Supabase: {str(e)}")
         return None
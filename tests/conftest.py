@@ -0,0 +1,54 @@
+import os
+import sys
+
+# app.py é um script Streamlit executado a partir de app/; sem o `streamlit run` ele roda em
+# "bare mode" (sem arquivo enviado, a interface não executa nenhuma análise) e pode ser importado
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app'))
+
+import numpy as np
+import pytest
+
+# Dados compartilhados pelos testes de extração e contagem de dígitos
+
+# Valores em que a normalização original está correta: decimais comuns, potências de 10,
+# vizinhos de limites de dígito e magnitudes extremas (exceto subnormais, ver abaixo)
+EDGE_VALUES = [
+    0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 3e-05, 9e-09, 9.99e-05, 0.00123,
+    1.0, 10.0, 100.0, 1000.0, 1e22, 1e23, 7e25, 1e-60, 1e300, 1.0000000000000001e+65,
+    0.29999999999999993, 0.30000000000000004, 999.9999999999999, 123.45, 12345678,
+    -45.6, -0.3, 1.7976931348623157e+308,
+]
+SUBNORMAL_VALUES = [5e-324, 1e-323, 2.5e-320, 2.2250738585072014e-308, 1e-307, 2e-300]
+
+# Limites de cada expoente (k·10^e e seus vizinhos), subnormais e valores sem dígito
+NUMBA_EDGE_VALUES = np.array(
+    [0.3, 0.6, 1e300, 9e-09, 1e-60, 1.0000000000000001e+65, 1.7976931348623157e+308]
+    + [float(f"{k}e{e}") for e in range(-323, 309) for k in (1, 5, 9)]
+    + [np.nextafter(float(f"1e{e}"), 0) for e in range(-300, 309, 7)]
+    + SUBNORMAL_VALUES + [0.0, -0.0, np.nan, np.inf, -np.inf]
+)
+
+
+@pytest.fixture
+def edge_values():
+    return list(EDGE_VALUES)
+
+
+@pytest.fixture
+def subnormal_values():
+    return list(SUBNORMAL_VALUES)
+
+
+@pytest.fixture
+def numba_edge_values():
+    return NUMBA_EDGE_VALUES.copy()
+
+
+@pytest.fixture
+def random_values():
+    """Fábrica de valores aleatórios de -10^300 a 10^300, mais zero, NaN e infinitos."""
+    def make(n=20_000, seed=0):
+        rng = np.random.default_rng(seed)
+        values = rng.uniform(-1, 1, n) * 10.0 ** rng.integers(-300, 300, n)
+        return np.concatenate([values, [0.0, np.nan, np.inf, -np.inf]])
+    return make
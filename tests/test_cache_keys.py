@@ -0,0 +1,60 @@
+import textwrap
+
+from streamlit.testing.v1 import AppTest
+
+# Os scripts abaixo rodam sob o AppTest, com o runtime real do Streamlit (como no `streamlit run`),
+# para exercitar a chave de cache calculada pelo st.cache_data.
+ANALYZE_COLUMN_SCRIPT = textwrap.dedent("""
+    import numpy as np
+    import pandas as pd
+    import streamlit as st
+
+    import app
+
+    # Série grande o suficiente para o hash padrão usar só uma amostra de 10 mil linhas
+    original = pd.Series(np.full(200_000, 1.0))
+    sample_index = original.sample(n=10_000, random_state=0).index
+
+    # Mesmo arquivo "corrigido" apenas fora da amostra: as contagens têm de mudar
+    corrected = original.copy()
+    corrected[corrected.index.difference(sample_index)] = 2.0
+
+    app.analyze_column.clear()
+    st.session_state['original'] = app.analyze_column(original, False, False)[0].tolist()
+    st.session_state['corrected'] = app.analyze_column(corrected, False, False)[0].tolist()
+""")
+
+
+def test_analyze_column_cache_sees_changes_outside_hash_sample():
+    at = AppTest.from_string(ANALYZE_COLUMN_SCRIPT).run()
+    assert not at.exception
+
+    assert at.session_state['original'] == [200_000, 0, 0, 0, 0, 0, 0, 0, 0]
+    assert at.session_state['corrected'] == [10_000, 190_000, 0, 0, 0, 0, 0, 0, 0]
+
+NORMALIZE_DATAFRAME_SCRIPT = textwrap.dedent("""
+    import pandas as pd
+    import streamlit as st
+
+    import app
+
+    # Coluna de texto grande: o primeiro upload tem só valores formatados válidos
+    original = pd.DataFrame({'valor': ['R$ 1,00'] * 200_000})
+    sample_index = original.sample(n=10_000, random_state=0).index
+
+    # Reenvio corrigido apenas fora da amostra do hash padrão
+    corrected = original.copy()
+    corrected.loc[corrected.index.difference(sample_index), 'valor'] = 'R$ 2,00'
+
+    app.normalize_dataframe.clear()
+    st.session_state['original'] = app.normalize_dataframe(original)[0]['valor_numeric'].sum()
+    st.session_state['corrected'] = app.normalize_dataframe(corrected)[0]['valor_numeric'].sum()
+""")
+
+
+def test_normalize_dataframe_cache_sees_changes_outside_hash_sample():
+    at = AppTest.from_string(NORMALIZE_DATAFRAME_SCRIPT).run()
+    assert not at.exception
+
+    assert at.session_state['original'] == 200_000.0
+    assert at.session_state['corrected'] == 10_000.0 + 2 * 190_000.0
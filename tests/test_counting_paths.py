@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import app
+
+PATHS = ['numpy', 'polars', 'numba']
+
+
+@pytest.fixture(params=PATHS)
+def counting_path(request, monkeypatch):
+    """Força count_first_digits a usar um único caminho de contagem."""
+    path = request.param
+    if path == 'polars' and not app._HAS_POLARS:
+        pytest.skip("polars não instalado")
+    if path == 'numba' and not app._HAS_NUMBA:
+        pytest.skip("numba não instalado")
+    monkeypatch.setattr(app, 'POLARS_MIN_SIZE', 0 if path == 'polars' else None)
+    monkeypatch.setattr(app, '_HAS_NUMBA', path == 'numba')
+    monkeypatch.setattr(app, 'NUMBA_MIN_SIZE', 0)
+    return path
+
+
+@pytest.fixture(params=['edge', 'edge-negative', 'random-wide', 'lognormal', 'empty'])
+def values(request, numba_edge_values, edge_values, random_values):
+    datasets = {
+        'edge': lambda: numba_edge_values,
+        'edge-negative': lambda: -numba_edge_values,
+        'random-wide': lambda: np.array(edge_values + random_values().tolist()),
+        'lognormal': lambda: np.random.default_rng(3).lognormal(3, 3, 50_000),
+        'empty': lambda: np.array([]),
+    }
+    return datasets[request.param]()
+
+
+def test_counting_paths_agree(counting_path, values):
+    expected = np.bincount(
+        [d for d in (app.extract_first_digit(x) for x in values.tolist()) if d is not None], minlength=10)[1:10]
+    np.testing.assert_array_equal(app.count_first_digits(values), expected)
@@ -0,0 +1,125 @@
+import math
+
+import numpy as np
+import pytest
+
+import app
+
+
+def baseline_first_digit(x_float):
+    """Normalização original (laços de multiplicação/divisão por 10) sobre o valor já convertido em float."""
+    if x_float == 0 or not math.isfinite(x_float):
+        return None
+    x_abs = abs(x_float)
+    if x_abs < 1:
+        while x_abs < 1:
+            x_abs *= 10
+    elif x_abs >= 10:
+        while x_abs >= 10:
+            x_abs /= 10
+    return int(x_abs)
+
+
+def baseline_counts(values):
+    counts = np.zeros(9, dtype=np.int64)
+    for x in values:
+        d = baseline_first_digit(float(x))
+        if d is not None:
+            counts[d - 1] += 1
+    return counts
+
+
+def test_extract_first_digit_matches_baseline(edge_values, random_values):
+    for x in edge_values + random_values(2_000).tolist():
+        assert app.extract_first_digit(x) == baseline_first_digit(x), x
+
+
+def test_extract_first_digit_formatted_text_matches_baseline():
+    for text, x in [("R$ 1.234,56", 1234.56), ("$1,234.56", 1234.56), ("0,3", 0.3), ("-7.000,00", -7000.0)]:
+        assert app.extract_first_digit(text) == baseline_first_digit(x)
+
+
+def test_vectorized_matches_baseline(edge_values, random_values):
+    values = np.array(edge_values + random_values().tolist())
+    expected = [d for d in (baseline_first_digit(x) for x in values) if d is not None]
+    np.testing.assert_array_equal(app.extract_first_digits_vectorized(values), expected)
+
+
+def test_vectorized_subnormals_match_scalar(subnormal_values):
+    # A normalização original erra nos subnormais (5e-324 -> 4); a referência é a versão escalar
+    digits = app.extract_first_digits_vectorized(np.array(subnormal_values))
+    assert digits.tolist() == [app.extract_first_digit(x) for x in subnormal_values]
+    assert digits.tolist() == [5, 1, 2, 2, 1, 2]
+
+
+def test_count_first_digits_matches_baseline(edge_values, random_values):
+    values = np.array(edge_values + random_values().tolist())
+    np.testing.assert_array_equal(app.count_first_digits(values), baseline_counts(values))
+
+
+@pytest.mark.parametrize('remove_zeros, remove_negatives', [(True, False), (False, True), (False, False)])
+def test_count_first_digits_csv_matches_baseline(edge_values, random_values, remove_zeros, remove_negatives):
+    values = np.array(edge_values + random_values(1_000).tolist())
+    csv = "valor\n" + "".join(f"{x!r}\n" for x in values)
+    skip_rows = 3
+    kept = values[skip_rows:]
+    kept = kept[np.isfinite(kept)]
+    if remove_zeros:
+        kept = kept[kept != 0]
+    if remove_negatives:
+        kept = kept[kept > 0]
+
+    counts, total_rows = app.count_first_digits_csv(
+        csv.encode(), 'utf-8', 'valor', skip_rows, False, remove_zeros, remove_negatives)
+    np.testing.assert_array_equal(counts, baseline_counts(kept))
+    assert total_rows == len(values) - skip_rows
+
+
+@pytest.mark.skipif(not app._HAS_NUMBA, reason="numba não instalado")
+@pytest.mark.parametrize("n_chunks", [1, 7])  # a divisão em blocos não altera as contagens
+def test_numba_kernel_matches_vectorized(numba_edge_values, edge_values, random_values, n_chunks):
+    for values in (numba_edge_values, -numba_edge_values, np.array(edge_values + random_values().tolist())):
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        counts = app._first_digit_counts_numba(values, app.FIRST_DIGIT_BOUNDS_ARRAY, n_chunks)
+        expected = np.bincount(app.extract_first_digits_vectorized(values), minlength=10)
+        np.testing.assert_array_equal(counts, expected)
+        # Nenhum valor finito e não nulo é descartado
+        assert counts.sum() == np.count_nonzero(np.isfinite(values) & (values != 0))
+
+
+def test_analyze_column_above_numba_threshold():
+    # Acima de NUMBA_MIN_SIZE o kernel Numba é usado (quando instalado)
+    rng = np.random.default_rng(1)
+    n = app.NUMBA_MIN_SIZE + 1_000
+    values = rng.lognormal(3, 3, n) * rng.choice([-1.0, 1.0], n)
+    values[::97] = np.nan
+    values[::89] = 0.0
+    series = app.pd.Series(values, name='valor')
+
+    observed, total_rows = app.analyze_column(series, True, False)
+
+    kept = values[np.isfinite(values) & (values != 0)]
+    np.testing.assert_array_equal(observed, np.bincount(app.extract_first_digits_vectorized(kept), minlength=10)[1:10])
+    assert total_rows == n
+
+
+def test_count_first_digits_read_only_array_above_numba_threshold():
+    values = np.random.default_rng(2).lognormal(3, 3, app.NUMBA_MIN_SIZE + 1_000)
+    values.flags.writeable = False
+    np.testing.assert_array_equal(
+        app.count_first_digits(values), np.bincount(app.extract_first_digits_vectorized(values), minlength=10)[1:10])
+
+
+@pytest.mark.parametrize('dtype', ['bool', 'boolean'])
+def test_analyze_column_ignores_boolean_columns(dtype):
+    # bool é numeric_dtype no pandas, mas True/False não têm primeiro dígito
+    series = app.pd.Series([True, False, True, True], dtype=dtype)
+    observed, total_rows = app.analyze_column(series, False, False)
+    assert observed.tolist() == [0] * 9
+    assert total_rows == 4
+
+
+def test_normalize_dataframe_skips_boolean_columns():
+    df = app.pd.DataFrame({'flag': [True, False, True], 'valor': [10, 20, 30]})
+    _, potential_numeric_cols = app.normalize_dataframe(df)
+    assert potential_numeric_cols == ['valor']
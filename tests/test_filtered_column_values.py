@@ -0,0 +1,36 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+
+
+@pytest.fixture(params=[True, False], ids=['polars', 'numpy'])
+def polars_enabled(request, monkeypatch):
+    if request.param and not app._HAS_POLARS:
+        pytest.skip("polars não instalado")
+    monkeypatch.setattr(app, 'POLARS_MIN_SIZE', 0 if request.param else None)
+    return request.param
+
+
+@pytest.mark.parametrize('series', [
+    pd.Series([1.5, np.nan, 0.0, -3.0, np.inf, 20.0]),
+    pd.Series([1, 0, -3, 20], dtype='int16'),
+    pd.Series([1, None, 0, -3, 20], dtype='Int64'),
+], ids=['float64', 'int16', 'Int64'])
+@pytest.mark.parametrize('remove_zeros, remove_negatives', [(True, False), (False, True), (False, False)])
+def test_filtered_column_values(polars_enabled, series, remove_zeros, remove_negatives):
+    values = app.filtered_column_values(series, remove_zeros, remove_negatives)
+
+    expected = series.astype('float64').to_numpy(na_value=np.nan)
+    expected = expected[np.isfinite(expected)]
+    if remove_zeros:
+        expected = expected[expected != 0]
+    if remove_negatives:
+        expected = expected[expected > 0]
+
+    np.testing.assert_array_equal(values, expected)
+    # Mesmo contrato nos dois caminhos: float64 contíguo e gravável
+    assert values.dtype == np.float64
+    assert values.flags.c_contiguous
+    assert values.flags.writeable
@@ -0,0 +1,41 @@
+import math
+
+import pytest
+
+import app
+
+
+def repr_first_digit(x):
+    """Primeiro dígito da representação decimal do float (a forma como o valor é digitado/exibido)."""
+    return int(repr(abs(float(x))).lstrip('0.')[0])
+
+
+def test_first_digit_of_float(edge_values):
+    for value in edge_values:
+        assert app._first_digit_of_float(value) == repr_first_digit(value), value
+
+
+def test_first_digit_of_float_subnormal(subnormal_values):
+    for value in subnormal_values:
+        assert app._first_digit_of_float(value) == repr_first_digit(value), value
+
+
+@pytest.mark.parametrize('value', [0.0, -0.0, math.inf, -math.inf, math.nan])
+def test_first_digit_of_float_without_digit(value):
+    assert app._first_digit_of_float(value) is None
+
+
+def test_first_digit_of_float_powers_of_ten():
+    for e in range(-323, 309):
+        for k in range(1, 10):
+            value = float(f"{k}e{e}")
+            if math.isfinite(value):
+                assert app._first_digit_of_float(value) == repr_first_digit(value), value
+
+
+@pytest.mark.parametrize('value, digit', [
+    ("R$ 1.234,56", 1), ("$1,234.56", 1), ("123,45", 1), ("-0,3", 3), (" 42 ", 4),
+    (7, 7), (0.6, 6), ("abc", None), ("", None), (None, None), (True, None), (10 ** 400, None),
+])
+def test_extract_first_digit(value, digit):
+    assert app.extract_first_digit(value) == digit
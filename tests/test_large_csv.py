@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import app
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    # Blocos pequenos: os casos abaixo atravessam vários blocos com poucas linhas
+    monkeypatch.setattr(app, 'CSV_CHUNK_ROWS', 3)
+
+
+def test_text_after_numeric_chunks_is_coerced_like_text(small_chunks):
+    rows = ["12", "34", "5.6", "R$ 7.000,00", "8,5", "n/d", "90"]
+    csv = ("valor\n" + "\n".join(rows) + "\n").encode()
+    counts, total_rows = app.count_first_digits_csv(csv, 'utf-8', 'valor', 0, False, True, False)
+    assert total_rows == len(rows)
+    # Dígitos 1, 3, 5, 7, 8, 9 ("n/d" não é numérico)
+    assert counts.tolist() == [1, 0, 1, 0, 1, 0, 1, 1, 1]
+
+
+def test_matches_text_column_conversion(small_chunks):
+    rows = ["R$ 1.234,56", "$2,500.00", "3,5", " 42 ", "abc", "-6.000,00"]
+    csv = ("texto\n" + "\n".join(f'"{r}"' for r in rows) + "\n").encode()
+    counts, _ = app.count_first_digits_csv(csv, 'utf-8', 'texto', 0, False, False, False)
+    expected = app.count_first_digits(app.coerce_numeric_text(app.pd.Series(rows)).to_numpy())
+    np.testing.assert_array_equal(counts, expected)
+
+
+def test_empty_rows_and_skip_rows(small_chunks):
+    csv = b"a,valor\nx,100\nx,200\n,\n,\nx,300\n,\ny,400\n"
+    counts, total_rows = app.count_first_digits_csv(csv, 'utf-8', 'valor', 1, True, True, False)
+    # Primeira linha pulada e as três linhas completamente vazias removidas
+    assert total_rows == 3
+    assert counts.tolist() == [0, 1, 1, 1, 0, 0, 0, 0, 0]
+
+    _, total_rows = app.count_first_digits_csv(csv, 'utf-8', 'valor', 1, False, True, False)
+    assert total_rows == 6
+
+
+def test_values_are_parsed_round_trip(small_chunks):
+    values = [999.9999999999999, 0.29999999999999993, 1e-60, 7e25]
+    csv = ("valor\n" + "".join(f"{x!r}\n" for x in values)).encode()
+    counts, _ = app.count_first_digits_csv(csv, 'utf-8', 'valor', 0, False, True, False)
+    assert counts.tolist() == [1, 1, 0, 0, 0, 0, 1, 0, 1]
+
+
+def test_boolean_chunks_have_no_digits(small_chunks):
+    # Blocos só com True/False são lidos como bool: nenhum dígito, como em analyze_column
+    rows = ["True", "False", "True", "12", "True", "3"]
+    csv = ("valor\n" + "\n".join(rows) + "\n").encode()
+    counts, total_rows = app.count_first_digits_csv(csv, 'utf-8', 'valor', 0, False, False, False)
+    assert total_rows == len(rows)
+    assert counts.tolist() == [1, 0, 1, 0, 0, 0, 0, 0, 0]